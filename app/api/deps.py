@@ -1,19 +1,24 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
 from app.core.database import get_db_connection, DatabaseConnection
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
-from app.core.security import verify_password
-from app.config import settings
+from app.core.security import verify_access_token
 from app.schemas.user import TokenData
 from app.models.user import User
 
 security = HTTPBearer()
 
+def _credentials_exception() -> HTTPException:
+    """401 nuevo en cada raise: una instancia compartida retendría __traceback__ y __context__"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 # Dependencias para inyección de dependencias
 def get_user_repository(db_connection: DatabaseConnection = Depends(get_db_connection)) -> UserRepository:
     return UserRepository(db_connection)
@@ -25,29 +30,20 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_service: UserService = Depends(get_user_service)
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    
+    payload = verify_access_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    token_data = TokenData(username=payload["sub"])
+
+    # Solo se cachean los claims del token; el usuario se lee en cada petición
+    # para que una desactivación o un borrado surtan efecto en todos los workers
     user = await user_service.get_user_by_username(username=token_data.username)
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.active or current_user.deleted_at is not None:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
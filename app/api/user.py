@@ -1,50 +0,0 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-
-from app.api.dependencies import get_db
-from app.schemas.user import UserInDB, UserCreate, UserUpdate
-from app.services.user_service import UserService
-from app.repositories.user import UserRepository
-
-router = APIRouter(prefix="/users", tags=["users"])
-
-user_repository = UserRepository(User)
-user_service = UserService(user_repository)
-
-@router.post("/", response_model=UserInDB)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = user_repository.get_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = user_repository.get_by_username(db, username=user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already taken")
-    return user_service.create_user(db=db, user_create=user)
-
-@router.get("/", response_model=List[UserInDB])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return user_service.get_users(db, skip=skip, limit=limit)
-
-@router.get("/{user_id}", response_model=UserInDB)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_service.get_user(db, user_id=user_id)
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return db_user
-
-@router.put("/{user_id}", response_model=UserInDB)
-def update_user(
-    user_id: int, user: UserUpdate, db: Session = Depends(get_db)
-):
-    db_user = user_service.update_user(db, user_id=user_id, user_update=user)
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return db_user
-
-@router.delete("/{user_id}", response_model=UserInDB)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_service.delete_user(db, user_id=user_id)
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return db_user
\ No newline at end of file
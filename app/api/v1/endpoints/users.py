@@ -1,5 +1,7 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
 from datetime import timedelta
 
 from app.api.deps import get_user_service, get_current_user, get_current_active_user
@@ -10,10 +12,31 @@ from app.schemas.user import (
 )
 from app.models.user import User
 from app.core.security import create_access_token
-from app.config import settings
+from app.core.config import settings
+from app.utils.helpers import etag_matches
 
 router = APIRouter()
 
+user_list_adapter = TypeAdapter(List[UserResponse])
+
+USER_CACHE_CONTROL = "private, max-age=30"
+ACCESS_TOKEN_EXPIRES = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+def _user_etag(user: User) -> str:
+    """ETag de un usuario derivado de su id y su última modificación"""
+    stamp = user.updated_at or user.created_at
+    version = stamp.timestamp() if stamp else 0
+    return '"' + hashlib.sha256(f"{user.id}:{version}".encode()).hexdigest() + '"'
+
+def _not_modified(request: Request, response: Response, user: User) -> Optional[Response]:
+    """Fijar cabeceras de caché y devolver un 304 si el cliente ya tiene esta versión"""
+    etag = _user_etag(user)
+    headers = {"ETag": etag, "Cache-Control": USER_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate,
@@ -22,7 +45,7 @@ async def register_user(
     """Registrar un nuevo usuario"""
     try:
         user = await user_service.create_user(user_data)
-        return UserResponse(**user.to_dict())
+        return UserResponse.from_db(user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,19 +75,23 @@ async def login_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.username, expires_delta=access_token_expires
+        subject=user.username, expires_delta=ACCESS_TOKEN_EXPIRES
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener información del usuario actual"""
-    return UserResponse(**current_user.to_dict())
+    not_modified = _not_modified(request, response, current_user)
+    if not_modified:
+        return not_modified
+    return UserResponse.from_db(current_user)
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
@@ -75,11 +102,17 @@ async def get_users(
 ):
     """Obtener lista de usuarios (requiere autenticación)"""
     users = await user_service.get_all_users(skip=skip, limit=limit)
-    return [UserResponse(**user.to_dict()) for user in users]
+    # Serializar la lista en una sola pasada de pydantic-core, sin re-encode de FastAPI
+    return Response(
+        content=user_list_adapter.dump_json([UserResponse.from_db(user) for user in users]),
+        media_type="application/json"
+    )
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: int,
+    request: Request,
+    response: Response,
     user_service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -90,7 +123,10 @@ async def get_user_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserResponse(**user.to_dict())
+    not_modified = _not_modified(request, response, user)
+    if not_modified:
+        return not_modified
+    return UserResponse.from_db(user)
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
@@ -110,7 +146,7 @@ async def update_current_user(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return UserResponse(**updated_user.to_dict())
+        return UserResponse.from_db(updated_user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -136,7 +172,7 @@ async def update_user(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return UserResponse(**updated_user.to_dict())
+        return UserResponse.from_db(updated_user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -149,7 +185,9 @@ async def delete_current_user(
     user_service: UserService = Depends(get_user_service)
 ):
     """Eliminar cuenta del usuario actual"""
-    success = await user_service.delete_user(current_user.id, deleted_by=current_user.id)
+    success = await user_service.delete_user(
+        current_user.id, deleted_by=current_user.id, existing_user=current_user
+    )
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,7 +221,7 @@ async def activate_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserResponse(**user.to_dict())
+    return UserResponse.from_db(user)
 
 @router.get("/me/game-stats", response_model=UserGameStats)
 async def get_current_user_game_stats(
@@ -192,15 +230,9 @@ async def get_current_user_game_stats(
 ):
     """Obtener estadísticas de juego del usuario actual"""
     # Verificar y resetear vidas diarias si es necesario
-    user = await user_service.check_and_reset_daily_lives(current_user.id)
+    user = await user_service.check_and_reset_daily_lives(current_user.id, user=current_user)
     
-    return UserGameStats(
-        total_points=user.total_points,
-        current_streak=user.current_streak,
-        max_streak=user.max_streak,
-        daily_lives=user.daily_lives,
-        lives_reset_date=user.lives_reset_date
-    )
+    return UserGameStats.model_validate(user)
 
 @router.put("/me/game-stats", response_model=UserGameStats)
 async def update_current_user_game_stats(
@@ -212,7 +244,8 @@ async def update_current_user_game_stats(
     updated_user = await user_service.update_user_game_stats(
         current_user.id, 
         stats_update, 
-        updated_by=current_user.id
+        updated_by=current_user.id,
+        existing_user=current_user
     )
     
     if not updated_user:
@@ -221,13 +254,7 @@ async def update_current_user_game_stats(
             detail="User not found"
         )
     
-    return UserGameStats(
-        total_points=updated_user.total_points,
-        current_streak=updated_user.current_streak,
-        max_streak=updated_user.max_streak,
-        daily_lives=updated_user.daily_lives,
-        lives_reset_date=updated_user.lives_reset_date
-    )
+    return UserGameStats.model_validate(updated_user)
 
 @router.put("/me/reset-lives", response_model=UserGameStats)
 async def reset_daily_lives(
@@ -243,10 +270,4 @@ async def reset_daily_lives(
             detail="User not found"
         )
     
-    return UserGameStats(
-        total_points=updated_user.total_points,
-        current_streak=updated_user.current_streak,
-        max_streak=updated_user.max_streak,
-        daily_lives=updated_user.daily_lives,
-        lives_reset_date=updated_user.lives_reset_date
-    )
\ No newline at end of file
+    return UserGameStats.model_validate(updated_user)
\ No newline at end of file
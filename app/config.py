@@ -1,29 +0,0 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
-
-class Settings(BaseSettings):
-    # Database
-    DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/users_db"
-    DATABASE_HOST: str = "db"
-    DATABASE_PORT: int = 5432
-    DATABASE_NAME: str = "users_db"
-    DATABASE_USER: str = "postgres"
-    DATABASE_PASSWORD: str = "postgres"
-    
-    # Security
-    SECRET_KEY: str = "your-secret-key-here"
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
-    # API
-    API_V1_STR: str = "/api/v1"
-    PROJECT_NAME: str = "Users API"
-    VERSION: str = "1.0.0"
-    
-    # CORS
-    BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8080"]
-    
-    class Config:
-        env_file = ".env"
-
-settings = Settings()
\ No newline at end of file
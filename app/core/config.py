@@ -1,7 +1,8 @@
 # app/core/config.py
-from typing import List, Optional, Union
+from typing import FrozenSet, List, Optional, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import field_validator
+from pydantic import Field, computed_field, model_validator
+from functools import cached_property, lru_cache
 import secrets
 import os
 
@@ -19,11 +20,13 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = "1.0.0"
     PROJECT_DESCRIPTION: str = "API para aplicación de aprendizaje tipo Duolingo"
     
-    # Security
-    SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Security (obligatoria fuera de desarrollo: todos los workers deben firmar
+    # y verificar los tokens con la misma clave)
+    SECRET_KEY: str = Field(min_length=1)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12
     
     # Database connection components
     POSTGRES_HOST: str = "localhost"
@@ -39,7 +42,8 @@ class Settings(BaseSettings):
     
     # CORS Configuration
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1"]
-    ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
+    # Lista JSON o string separado por comas; ver CORS_ORIGINS
+    ALLOWED_ORIGINS: Union[List[str], str] = ["http://localhost:3000"]
     ALLOWED_METHODS: List[str] = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
     ALLOWED_HEADERS: List[str] = ["*"]
     
@@ -73,15 +77,39 @@ class Settings(BaseSettings):
     ENV_DATABASE_URL: Optional[str] = None
     ENV_DATABASE_URL_SYNC: Optional[str] = None
     
-    @field_validator("ALLOWED_ORIGINS", mode='before')
-    @classmethod
-    def assemble_cors_origins(cls, v: Union[str, List[str]]) -> List[str]:
-        """Parsear orígenes CORS desde string o lista."""
-        if isinstance(v, str) and not v.startswith("["):
-            return [i.strip() for i in v.split(",")]
-        elif isinstance(v, (list, str)):
-            return v
-        raise ValueError(v)
+    # Workers de uvicorn; el Dockerfile, docker-compose y app/main.py lo exportan
+    WEB_CONCURRENCY: int = 1
+    
+    # Database pool
+    # Presupuesto total de conexiones entre todos los workers (max_connections
+    # de PostgreSQL, 100 por defecto, menos un margen para administración)
+    DATABASE_MAX_CONNECTIONS: int = 90
+    DATABASE_POOL_MIN_SIZE: int = 5
+    DATABASE_POOL_MAX_SIZE: int = 20  # tope por worker; ver DATABASE_POOL_WORKER_MAX_SIZE
+    DATABASE_POOL_TIMEOUT: int = 30  # seconds
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_PRE_PING_IDLE: int = 30  # seconds; solo se hace ping a conexiones ociosas más tiempo
+    
+    @computed_field
+    @cached_property
+    def CORS_ORIGINS(self) -> FrozenSet[str]:
+        """Orígenes CORS normalizados, calculados una sola vez por instancia."""
+        origins = self.ALLOWED_ORIGINS
+        if isinstance(origins, str):
+            origins = origins.split(",")
+        return frozenset(o.strip() for o in origins if o.strip())
+    
+    @property
+    def DATABASE_POOL_WORKER_MAX_SIZE(self) -> int:
+        """Máximo del pool de cada worker: el reparto del presupuesto total, sin pasar DATABASE_POOL_MAX_SIZE."""
+        share = self.DATABASE_MAX_CONNECTIONS // max(1, self.WEB_CONCURRENCY)
+        return max(1, min(self.DATABASE_POOL_MAX_SIZE, share))
+    
+    @property
+    def DATABASE_POOL_WORKER_MIN_SIZE(self) -> int:
+        """Conexiones abiertas al arrancar cada worker (nunca más que su máximo)."""
+        return min(self.DATABASE_POOL_MIN_SIZE, self.DATABASE_POOL_WORKER_MAX_SIZE)
     
     @property
     def DATABASE_URL(self) -> str:
@@ -121,6 +149,16 @@ class Settings(BaseSettings):
 class DevelopmentSettings(Settings):
     DEBUG: bool = True
     LOG_LEVEL: str = "DEBUG"
+    # Clave aleatoria por proceso: los tokens no sobreviven a un reinicio.
+    # Una clave vacía sigue rechazándose (PyJWT firmaría con ella)
+    SECRET_KEY: str = Field(default_factory=lambda: secrets.token_urlsafe(32), min_length=1)
+    
+    @model_validator(mode="after")
+    def _require_shared_key_with_workers(self) -> "DevelopmentSettings":
+        """Con varios workers cada uno generaría su propia clave y rechazaría los tokens del resto."""
+        if "SECRET_KEY" not in self.model_fields_set and self.WEB_CONCURRENCY > 1:
+            raise ValueError("SECRET_KEY must be set when running more than one worker")
+        return self
 
 
 class ProductionSettings(Settings):
@@ -132,12 +170,14 @@ class ProductionSettings(Settings):
 class TestingSettings(Settings):
     DEBUG: bool = True
     TESTING: bool = True
+    BCRYPT_ROUNDS: int = 4
     LOG_LEVEL: str = "DEBUG"
     POSTGRES_DB: str = "learning_app_test"
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Factory para obtener configuración según el entorno."""
+    """Factory para obtener configuración según el entorno (cacheada por proceso)."""
     environment = os.getenv("ENVIRONMENT", "development").lower()
     
     if environment == "production":
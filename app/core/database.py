@@ -1,38 +1,104 @@
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional
 import logging
-from app.config import settings
+import threading
+import time
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+class _PooledConnection(psycopg2.extensions.connection):
+    """Conexión que recuerda cuándo se abrió y cuándo volvió al pool por última vez"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened_at = self.last_used_at = time.monotonic()
+
 class DatabaseConnection:
     def __init__(self):
-        self.connection_params = {
-            "host": settings.DATABASE_HOST,
-            "port": settings.DATABASE_PORT,
-            "database": settings.DATABASE_NAME,
-            "user": settings.DATABASE_USER,
-            "password": settings.DATABASE_PASSWORD,
-        }
+        self.connection_params = {"dsn": settings.DATABASE_URL_SYNC}
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # Limita los hilos que usan el pool a la vez: al llenarse esperan (hasta
+        # DATABASE_POOL_TIMEOUT) en lugar de recibir PoolError al instante
+        self._slots = threading.BoundedSemaphore(settings.DATABASE_POOL_WORKER_MAX_SIZE)
+        self._recycle = settings.DATABASE_POOL_RECYCLE
+        self._pre_ping = settings.DATABASE_POOL_PRE_PING
+        self._pre_ping_idle = settings.DATABASE_POOL_PRE_PING_IDLE
+        self._timeout = settings.DATABASE_POOL_TIMEOUT
+    
+    @property
+    def pool(self) -> ThreadedConnectionPool:
+        """Pool de conexiones, creado perezosamente en el primer uso"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        minconn=settings.DATABASE_POOL_WORKER_MIN_SIZE,
+                        maxconn=settings.DATABASE_POOL_WORKER_MAX_SIZE,
+                        connection_factory=_PooledConnection,
+                        **self.connection_params
+                    )
+        return self._pool
+    
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        """Comprobar que una conexión del pool sigue viva y no ha caducado"""
+        if conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        now = time.monotonic()
+        if now - conn.opened_at > self._recycle:
+            return False
+        # Ping solo a las conexiones ociosas: las de uso continuo no pagan
+        # los dos round-trips extra (SELECT 1 y rollback)
+        if self._pre_ping and now - conn.last_used_at > self._pre_ping_idle:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+    
+    def _checkout(self) -> psycopg2.extensions.connection:
+        """Tomar una conexión válida del pool, descartando las caídas o caducadas"""
+        pool = self.pool
+        while True:
+            conn = pool.getconn()
+            if self._is_usable(conn):
+                return conn
+            pool.putconn(conn, close=True)
+    
+    def close_pool(self) -> None:
+        """Cerrar todas las conexiones del pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
     
     @contextmanager
     def get_connection(self) -> Generator[psycopg2.extensions.connection, None, None]:
-        """Context manager para conexiones a la base de datos"""
+        """Context manager para conexiones a la base de datos (tomadas del pool)"""
         conn = None
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PoolError("Timed out waiting for a database connection")
         try:
-            conn = psycopg2.connect(**self.connection_params)
+            conn = self._checkout()
             conn.autocommit = False
             yield conn
         except psycopg2.Error as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
         finally:
             if conn:
-                conn.close()
+                conn.last_used_at = time.monotonic()
+                self.pool.putconn(conn)
+            self._slots.release()
     
     @contextmanager
     def get_cursor(self, connection: psycopg2.extensions.connection) -> Generator[psycopg2.extras.RealDictCursor, None, None]:
@@ -50,4 +116,4 @@ db_connection = DatabaseConnection()
 
 def get_db_connection():
     """Dependency para obtener conexión a la base de datos"""
-    return db_connection
\ No newline at end of file
+    return db_connection
@@ -1,6 +1,7 @@
 # app/core/dependencies.py
+from datetime import datetime
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
@@ -16,6 +17,38 @@ logger = logging.getLogger(__name__)
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
+# Mensajes de los 401 de autenticación
+_DETAIL_NO_TOKEN = "No se proporcionó token de autenticación"
+_DETAIL_INVALID = "Token inválido"
+_DETAIL_GENERIC = "Error de autenticación"
+
+
+def _auth_exception(detail: str) -> HTTPException:
+    """401 nuevo en cada raise: una instancia compartida retendría __traceback__ y __context__"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+# Plantilla del usuario dummy, validada una sola vez
+# TODO: Remover cuando implementemos el repository
+_DUMMY_USER = UserResponse(
+    id=0,
+    username="dummy_user",
+    email="dummy@example.com",
+    first_name="Dummy",
+    last_name="User",
+    total_points=0,
+    current_streak=0,
+    max_streak=0,
+    daily_lives=5,
+    lives_reset_date=None,
+    created_at=datetime(1970, 1, 1),
+    updated_at=None,
+    active=True
+)
+
 # =============================================================================
 # DATABASE DEPENDENCIES
 # =============================================================================
@@ -40,109 +73,79 @@ def get_db_sync() -> Session:
 # AUTHENTICATION DEPENDENCIES
 # =============================================================================
 
-async def get_optional_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db)
+async def _resolve_user(
+    credentials: Optional[HTTPAuthorizationCredentials],
+    db: AsyncSession
 ) -> Optional[UserResponse]:
     """
-    Obtiene el usuario actual si está autenticado, sino retorna None.
-    Útil para endpoints que funcionan con o sin autenticación.
+    Resuelve el usuario a partir de las credenciales.
+    Retorna None si no hay token o si no es válido.
     """
     if not credentials:
         return None
     
-    try:
-        token = credentials.credentials
-        payload = verify_access_token(token)
-        
-        if not payload:
-            return None
-        
-        user_id = payload.get("sub")
-        if not user_id:
-            return None
-        
-        # Aquí implementaremos la lógica para obtener el usuario
-        # Por ahora retornamos None
-        # TODO: Implementar cuando tengamos el UserRepository
+    payload = verify_access_token(credentials.credentials)
+    if not payload:
         return None
-        
-    except Exception as e:
-        logger.warning(f"Error verifying optional token: {e}")
+    
+    user_id = payload.get("sub")
+    if not user_id:
         return None
+    
+    # TODO: Implementar cuando tengamos el UserRepository
+    # user = await user_repository.get_by_id(int(user_id))
+    
+    # Por ahora retornamos un usuario dummy
+    # TODO: Remover cuando implementemos el repository
+    return _DUMMY_USER.model_copy(update={"id": int(user_id)})
+
+
+async def get_optional_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[UserResponse]:
+    """
+    Obtiene el usuario actual si está autenticado, sino retorna None.
+    Útil para endpoints que funcionan con o sin autenticación.
+    """
+    # Sin UserRepository no hay usuario real que devolver: se trata como anónimo
+    # en lugar de exponer el usuario dummy de _resolve_user
+    # TODO: Implementar cuando tengamos el UserRepository
+    return None
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> UserResponse:
     """
     Obtiene el usuario actual autenticado.
     Lanza excepción si no está autenticado o el token es inválido.
+    El resultado se memoriza en request.state.current_user.
     """
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+    
     if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No se proporcionó token de autenticación",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _auth_exception(_DETAIL_NO_TOKEN)
     
     try:
-        token = credentials.credentials
-        payload = verify_access_token(token)
-        
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token malformado",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # TODO: Implementar cuando tengamos el UserRepository
-        # user = await user_repository.get_by_id(int(user_id))
-        # if not user:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_401_UNAUTHORIZED,
-        #         detail="Usuario no encontrado",
-        #         headers={"WWW-Authenticate": "Bearer"},
-        #     )
-        
-        # Por ahora retornamos un usuario dummy
-        # TODO: Remover cuando implementemos el repository
-        return UserResponse(
-            id=int(user_id),
-            username="dummy_user",
-            email="dummy@example.com",
-            first_name="Dummy",
-            last_name="User",
-            total_points=0,
-            current_streak=0,
-            max_streak=0,
-            daily_lives=5,
-            active=True
-        )
-        
-    except HTTPException:
-        raise
+        current_user = await _resolve_user(credentials, db)
     except Exception as e:
-        logger.error(f"Error verifying token: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Error de autenticación",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.error("Error verifying token: %s", e)
+        raise _auth_exception(_DETAIL_GENERIC)
+    
+    if current_user is None:
+        raise _auth_exception(_DETAIL_INVALID)
+    
+    request.state.current_user = current_user
+    return current_user
 
 
 async def get_current_active_user(
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user, use_cache=True)
 ) -> UserResponse:
     """
     Obtiene el usuario actual y verifica que esté activo.
@@ -165,7 +168,7 @@ def require_permissions(*required_permissions: str):
     TODO: Implementar cuando tengamos sistema de roles y permisos.
     """
     def permission_dependency(
-        current_user: UserResponse = Depends(get_current_active_user)
+        current_user: UserResponse = Depends(get_current_active_user, use_cache=True)
     ) -> UserResponse:
         # TODO: Implementar verificación de permisos
         # Por ahora permitimos todo
@@ -180,7 +183,7 @@ def require_admin():
     TODO: Implementar cuando tengamos sistema de roles.
     """
     def admin_dependency(
-        current_user: UserResponse = Depends(get_current_active_user)
+        current_user: UserResponse = Depends(get_current_active_user, use_cache=True)
     ) -> UserResponse:
         # TODO: Verificar si el usuario es admin
         # if not current_user.is_admin:
@@ -198,35 +201,14 @@ def require_admin():
 # =============================================================================
 
 def get_pagination_params(
-    page: int = 1,
-    page_size: int = 10,
-    max_page_size: int = 100
-):
+    page: int = Query(1, ge=1, description="Número de página"),
+    page_size: int = Query(10, ge=1, le=100, description="Tamaño de página")
+) -> dict:
     """
     Dependencia para parámetros de paginación.
+    Los límites los valida FastAPI al parsear la query.
     """
-    def pagination_dependency():
-        if page < 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El número de página debe ser mayor a 0"
-            )
-        
-        if page_size < 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El tamaño de página debe ser mayor a 0"
-            )
-        
-        if page_size > max_page_size:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El tamaño de página no puede ser mayor a {max_page_size}"
-            )
-        
-        return {"page": page, "page_size": page_size}
-    
-    return pagination_dependency
+    return {"page": page, "page_size": page_size}
 
 
 # =============================================================================
@@ -253,9 +235,11 @@ def get_client_ip(request):
     """
     Obtiene la IP del cliente para rate limiting y logging.
     """
-    forwarded = request.headers.get("X-Forwarded-For")
+    forwarded = request.headers.get("x-forwarded-for")
     if forwarded:
-        return forwarded.split(",")[0].strip()
+        # Solo interesa el primer salto: evitar partir toda la cadena
+        idx = forwarded.find(",")
+        return (forwarded[:idx] if idx != -1 else forwarded).strip()
     return request.client.host
 
 
@@ -1,26 +1,75 @@
-from datetime import datetime, timedelta
-from typing import Any, Union, Optional
-from jose import jwt
-from passlib.context import CryptContext
-from app.config import settings
+from datetime import timedelta
+from typing import Any, Dict, Union, Optional
+import hashlib
+import threading
+import time
+import bcrypt
+import jwt
+from cachetools import TTLCache
+from jwt import InvalidTokenError
+from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = [settings.ALGORITHM]
+
+# bcrypt solo usa los primeros 72 bytes de la contraseña
+BCRYPT_MAX_BYTES = 72
+
+# Payloads de tokens ya verificados, por digest del token. El TTL corto acota
+# cuánto tarda en notarse un cambio de SECRET_KEY.
+_access_cache: TTLCache = TTLCache(
+    maxsize=10_000,
+    ttl=min(ACCESS_TOKEN_EXPIRE_SECONDS, 30)
+)
+_access_cache_lock = threading.Lock()
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
+    now = int(time.time())
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        expire = now + ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode = {"iat": now, "exp": expire, "sub": str(subject)}
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode()[:BCRYPT_MAX_BYTES], hashed_password.encode()
+        )
+    except ValueError:
+        # Hash con formato inválido
+        return False
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return bcrypt.hashpw(
+        password.encode()[:BCRYPT_MAX_BYTES], bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    ).decode()
+
+def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verificar un token de acceso y devolver su payload, o None si no es válido.
+    
+    Los tokens válidos se cachean para no repetir la verificación HMAC en cada petición.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    # TTLCache.get también modifica la caché (expira entradas): lectura y escritura con lock
+    with _access_cache_lock:
+        payload = _access_cache.get(key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        return None
+    
+    try:
+        payload = jwt.decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
+    except InvalidTokenError:
+        return None
+    
+    with _access_cache_lock:
+        _access_cache[key] = payload
+    return payload
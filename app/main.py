@@ -1,91 +1,158 @@
 # app/main.py
+import hashlib
 import logging
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+import orjson
+import psycopg2
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
-from app.config import settings
+from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.database import db_connection
+from app.utils.helpers import etag_matches
 
 # Configurar logging
 logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=settings.LOG_LEVEL,
+    format=settings.LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Ciclo de vida de la aplicación: abre el pool al arrancar y lo cierra al terminar"""
+    logger.info("Starting %s v%s", settings.PROJECT_NAME, settings.PROJECT_VERSION)
+    logger.info("API documentation available at: /docs")
+    try:
+        db_connection.pool
+    except psycopg2.Error as e:
+        # Sin base de datos al arrancar: el pool se creará en la primera petición
+        logger.warning("Could not open database pool at startup: %s", e)
+    yield
+    logger.info("Shutting down %s", settings.PROJECT_NAME)
+    db_connection.close_pool()
+
+def _handle_http_exception(exc: HTTPException) -> ORJSONResponse:
+    # Las cabeceras de la excepción (WWW-Authenticate, Retry-After...) llegan al cliente
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "status_code": exc.status_code},
+        headers=exc.headers
+    )
+
+def _handle_value_error(exc: ValueError) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=400,
+        content={"detail": str(exc), "status_code": 400}
+    )
+
+def _handle_unexpected(exc: Exception) -> ORJSONResponse:
+    logger.error("Unhandled exception: %s", exc)
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": "Internal server error", "status_code": 500}
+    )
+
+_EXCEPTION_DISPATCH = {
+    HTTPException: _handle_http_exception,
+    ValueError: _handle_value_error,
+}
+
+async def unified_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """Handler de excepciones: búsqueda directa por tipo y, para subclases, por isinstance"""
+    handler = _EXCEPTION_DISPATCH.get(type(exc))
+    if handler is None:
+        handler = next(
+            (h for exc_class, h in _EXCEPTION_DISPATCH.items() if isinstance(exc, exc_class)),
+            _handle_unexpected
+        )
+    return handler(exc)
+
+class HealthCheckMiddleware:
+    """Middleware ASGI que responde /health directamente, sin recorrer el resto del stack"""
+    
+    def __init__(self, app, body: bytes):
+        self.app = app
+        self.start_message = {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+        self.body_message = {"type": "http.response.body", "body": body}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+            await send(self.start_message)
+            await send(self.body_message)
+            return
+        await self.app(scope, receive, send)
+
 def create_application() -> FastAPI:
     """Factory function para crear la aplicación FastAPI"""
     
     application = FastAPI(
         title=settings.PROJECT_NAME,
-        version=settings.VERSION,
+        version=settings.PROJECT_VERSION,
         description="API de usuarios con arquitectura en capas y procedimientos almacenados",
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
 
     # Configurar CORS
     application.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.BACKEND_CORS_ORIGINS,
+        allow_origins=settings.CORS_ORIGINS,
         allow_credentials=True,
-        allow_methods=["GET", "POST", "PUT", "DELETE"],
-        allow_headers=["*"],
+        allow_methods=settings.ALLOWED_METHODS,
+        allow_headers=settings.ALLOWED_HEADERS,
     )
 
+    # Comprimir respuestas grandes (p. ej. listados de usuarios)
+    application.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
     # Incluir rutas de la API
     application.include_router(api_router, prefix=settings.API_V1_STR)
 
-    # Event handlers
-    @application.on_event("startup")
-    async def startup_event():
-        logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
-        logger.info(f"API documentation available at: /docs")
-    
-    @application.on_event("shutdown")
-    async def shutdown_event():
-        logger.info(f"Shutting down {settings.PROJECT_NAME}")
-
-    # Exception handlers
-    @application.exception_handler(HTTPException)
-    async def http_exception_handler(request, exc):
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={"detail": exc.detail, "status_code": exc.status_code}
-        )
+    # Exception handlers: un único handler con despacho por tipo
+    for exc_class in (HTTPException, ValueError, Exception):
+        application.add_exception_handler(exc_class, unified_exception_handler)
 
-    @application.exception_handler(ValueError)
-    async def value_error_handler(request, exc):
-        return JSONResponse(
-            status_code=400,
-            content={"detail": str(exc), "status_code": 400}
-        )
+    # Root endpoint: el contenido solo depende de settings, se serializa una vez
+    root_body = orjson.dumps({
+        "message": f"Welcome to {settings.PROJECT_NAME}",
+        "version": settings.PROJECT_VERSION,
+        "docs": "/docs",
+        "redoc": "/redoc"
+    })
+    root_etag = '"' + hashlib.blake2b(root_body, digest_size=16).hexdigest() + '"'
+    root_headers = {"ETag": root_etag, "Cache-Control": "public, max-age=3600"}
 
-    @application.exception_handler(Exception)
-    async def general_exception_handler(request, exc):
-        logger.error(f"Unhandled exception: {exc}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error", "status_code": 500}
-        )
-
-    # Root endpoint
     @application.get("/")
-    async def root():
-        return {
-            "message": f"Welcome to {settings.PROJECT_NAME}",
-            "version": settings.VERSION,
-            "docs": "/docs",
-            "redoc": "/redoc"
-        }
+    async def root(request: Request):
+        if etag_matches(request.headers.get("if-none-match"), root_etag):
+            return Response(status_code=304, headers=root_headers)
+        return Response(content=root_body, media_type="application/json", headers=root_headers)
+
+    # Health check endpoint (normalmente respondido por HealthCheckMiddleware)
+    health_content = {"status": "healthy", "service": settings.PROJECT_NAME}
 
-    # Health check endpoint
     @application.get("/health")
     async def health_check():
-        return {"status": "healthy", "service": settings.PROJECT_NAME}
+        return health_content
+
+    # Registrado el último para quedar por fuera de CORS y GZip
+    application.add_middleware(HealthCheckMiddleware, body=orjson.dumps(health_content))
 
     return application
 
@@ -93,10 +160,18 @@ def create_application() -> FastAPI:
 app = create_application()
 
 if __name__ == "__main__":
+    # Recarga solo en desarrollo; en el resto, 2n+1 workers salvo WEB_CONCURRENCY.
+    # Se exporta para que cada worker reparta DATABASE_MAX_CONNECTIONS entre todos.
+    reload = settings.is_development
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    os.environ["WEB_CONCURRENCY"] = str(workers)
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        reload=reload,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        log_level=settings.LOG_LEVEL.lower()
     )
\ No newline at end of file
@@ -1,30 +1,25 @@
-from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional, List
+from typing import Protocol, TypeVar, Optional, List, runtime_checkable
 import logging
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
-class BaseRepository(ABC, Generic[T]):
-    """Repositorio base con operaciones CRUD genéricas"""
+@runtime_checkable
+class BaseRepository(Protocol[T]):
+    """Repositorio base con operaciones CRUD genéricas (tipado estructural)"""
     
-    @abstractmethod
     async def create(self, entity: T) -> T:
-        pass
+        ...
     
-    @abstractmethod
     async def get_by_id(self, id: int) -> Optional[T]:
-        pass
+        ...
     
-    @abstractmethod
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
-        pass
+        ...
     
-    @abstractmethod
     async def update(self, id: int, entity: T) -> Optional[T]:
-        pass
+        ...
     
-    @abstractmethod
     async def delete(self, id: int) -> bool:
-        pass
\ No newline at end of file
+        ...
\ No newline at end of file
@@ -1,201 +1,219 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Sequence, Tuple
 import logging
 from datetime import date
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from starlette.concurrency import run_in_threadpool
 
-from app.repositories.base import BaseRepository
 from app.models.user import User
 from app.core.database import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
-class UserRepository(BaseRepository[User]):
+class UserRepository:
+    """Implementa BaseRepository[User] sobre procedimientos almacenados"""
+    
     def __init__(self, db_connection: DatabaseConnection):
         self.db_connection = db_connection
+        # Caché de lecturas de esta petición (el repositorio se crea por petición);
+        # los métodos que modifican datos la vacían
+        self._cache: Dict[Tuple[str, Any], User] = {}
+    
+    def _remember(self, user: User) -> User:
+        """Guardar un usuario leído bajo sus tres claves de búsqueda"""
+        self._cache[("id", user.id)] = user
+        self._cache[("username", user.username)] = user
+        self._cache[("email", user.email)] = user
+        return user
+    
+    def _execute_procedure(self, procedure: str, params: Sequence[Any],
+                           fetch_all: bool = False, commit: bool = False) -> Any:
+        """Ejecutar un procedimiento almacenado (bloqueante)"""
+        with self.db_connection.get_connection() as conn:
+            with self.db_connection.get_cursor(conn) as cursor:
+                cursor.callproc(procedure, params)
+                result = cursor.fetchall() if fetch_all else cursor.fetchone()
+                if commit:
+                    conn.commit()
+                return result
+    
+    async def _call_procedure(self, procedure: str, params: Sequence[Any],
+                              fetch_all: bool = False, commit: bool = False) -> Any:
+        """Ejecutar un procedimiento almacenado en el threadpool, sin bloquear el event loop"""
+        return await run_in_threadpool(
+            self._execute_procedure, procedure, params, fetch_all, commit
+        )
     
     async def create(self, user: User) -> User:
         """Crear un nuevo usuario usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_create_user', [
-                        user.username,
-                        user.email,
-                        user.password_hash,
-                        user.first_name,
-                        user.last_name,
-                        user.avatar_url,
-                        user.preferred_language,
-                        user.timezone,
-                        user.created_by
-                    ])
-                    
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_create_user', [
+                user.username,
+                user.email,
+                user.password_hash,
+                user.first_name,
+                user.last_name,
+                user.avatar_url,
+                user.preferred_language,
+                user.timezone,
+                user.created_by
+            ], commit=True)
+            
+            if result:
+                return User.from_dict(result)
+            return None
+        except psycopg2.errors.UniqueViolation:
+            raise
         except psycopg2.Error as e:
-            logger.error(f"Error creating user: {e}")
+            logger.error("Error creating user: %s", e)
             raise
     
+    async def create_if_unique(self, user: User) -> Optional[User]:
+        """Crear usuario delegando la unicidad en las restricciones de la tabla.
+        
+        Devuelve None si el username o el email ya existen, sin consultas previas.
+        """
+        try:
+            return await self.create(user)
+        except psycopg2.errors.UniqueViolation:
+            return None
+    
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Obtener usuario por ID usando procedimiento almacenado"""
+        cached = self._cache.get(("id", user_id))
+        if cached is not None:
+            return cached
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_get_user_by_id', [user_id])
-                    result = cursor.fetchone()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_get_user_by_id', [user_id])
+            
+            if result:
+                return self._remember(User.from_dict(result))
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error getting user by id {user_id}: {e}")
+            logger.error("Error getting user by id %s: %s", user_id, e)
             raise
     
     async def get_by_username(self, username: str) -> Optional[User]:
         """Obtener usuario por username usando procedimiento almacenado"""
+        cached = self._cache.get(("username", username))
+        if cached is not None:
+            return cached
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_get_user_by_username', [username])
-                    result = cursor.fetchone()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_get_user_by_username', [username])
+            
+            if result:
+                return self._remember(User.from_dict(result))
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error getting user by username {username}: {e}")
+            logger.error("Error getting user by username %s: %s", username, e)
             raise
     
     async def get_by_email(self, email: str) -> Optional[User]:
         """Obtener usuario por email usando procedimiento almacenado"""
+        cached = self._cache.get(("email", email))
+        if cached is not None:
+            return cached
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_get_user_by_email', [email])
-                    result = cursor.fetchone()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_get_user_by_email', [email])
+            
+            if result:
+                return self._remember(User.from_dict(result))
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error getting user by email {email}: {e}")
+            logger.error("Error getting user by email %s: %s", email, e)
             raise
     
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Obtener todos los usuarios usando procedimiento almacenado"""
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_get_all_users', [skip, limit])
-                    results = cursor.fetchall()
-                    
-                    return [User.from_dict(dict(row)) for row in results]
+            results = await self._call_procedure('sp_get_all_users', [skip, limit], fetch_all=True)
+            
+            return [User.from_dict(row) for row in results]
         except psycopg2.Error as e:
-            logger.error(f"Error getting all users: {e}")
+            logger.error("Error getting all users: %s", e)
             raise
     
     async def update(self, user_id: int, user: User) -> Optional[User]:
         """Actualizar usuario usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_update_user', [
-                        user_id,
-                        user.username,
-                        user.email,
-                        user.password_hash,
-                        user.first_name,
-                        user.last_name,
-                        user.avatar_url,
-                        user.preferred_language,
-                        user.timezone,
-                        user.updated_by
-                    ])
-                    
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_update_user', [
+                user_id,
+                user.username,
+                user.email,
+                user.password_hash,
+                user.first_name,
+                user.last_name,
+                user.avatar_url,
+                user.preferred_language,
+                user.timezone,
+                user.updated_by
+            ], commit=True)
+            
+            if result:
+                return User.from_dict(result)
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error updating user {user_id}: {e}")
+            logger.error("Error updating user %s: %s", user_id, e)
             raise
     
     async def update_game_stats(self, user_id: int, total_points: int = None, 
                                current_streak: int = None, max_streak: int = None, 
                                daily_lives: int = None, updated_by: int = None) -> Optional[User]:
         """Actualizar estadísticas del juego usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_update_user_game_stats', [
-                        user_id,
-                        total_points,
-                        current_streak,
-                        max_streak,
-                        daily_lives,
-                        updated_by
-                    ])
-                    
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_update_user_game_stats', [
+                user_id,
+                total_points,
+                current_streak,
+                max_streak,
+                daily_lives,
+                updated_by
+            ], commit=True)
+            
+            if result:
+                return User.from_dict(result)
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error updating user game stats {user_id}: {e}")
+            logger.error("Error updating user game stats %s: %s", user_id, e)
             raise
     
     async def delete(self, user_id: int, deleted_by: int = None) -> bool:
         """Eliminar usuario (soft delete) usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_delete_user', [user_id, deleted_by])
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    # El procedimiento devuelve True si se eliminó correctamente
-                    return result[0] if result else False
+            result = await self._call_procedure('sp_delete_user', [user_id, deleted_by], commit=True)
+            
+            # El procedimiento devuelve True si se eliminó correctamente
+            return result[0] if result else False
         except psycopg2.Error as e:
-            logger.error(f"Error deleting user {user_id}: {e}")
+            logger.error("Error deleting user %s: %s", user_id, e)
             raise
     
     async def activate_user(self, user_id: int, updated_by: int = None) -> Optional[User]:
         """Activar usuario usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_activate_user', [user_id, updated_by])
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_activate_user', [user_id, updated_by], commit=True)
+            
+            if result:
+                return User.from_dict(result)
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error activating user {user_id}: {e}")
+            logger.error("Error activating user %s: %s", user_id, e)
             raise
     
     async def reset_daily_lives(self, user_id: int) -> Optional[User]:
         """Resetear vidas diarias usando procedimiento almacenado"""
+        self._cache.clear()
         try:
-            with self.db_connection.get_connection() as conn:
-                with self.db_connection.get_cursor(conn) as cursor:
-                    cursor.callproc('sp_reset_daily_lives', [user_id])
-                    result = cursor.fetchone()
-                    conn.commit()
-                    
-                    if result:
-                        return User.from_dict(dict(result))
-                    return None
+            result = await self._call_procedure('sp_reset_daily_lives', [user_id], commit=True)
+            
+            if result:
+                return User.from_dict(result)
+            return None
         except psycopg2.Error as e:
-            logger.error(f"Error resetting daily lives for user {user_id}: {e}")
-            raise
\ No newline at end of file
+            logger.error("Error resetting daily lives for user %s: %s", user_id, e)
+            raise
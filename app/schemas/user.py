@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 from datetime import datetime, date
 
@@ -12,13 +12,8 @@ class UserBase(BaseModel):
     timezone: str = Field("UTC", max_length=50)
 
 class UserCreate(UserBase):
+    # min_length lo valida pydantic-core sin pasar por Python
     password: str = Field(..., min_length=6)
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        return v
 
 class UserUpdate(BaseModel):
     username: Optional[str] = Field(None, min_length=3, max_length=50)
@@ -29,12 +24,6 @@ class UserUpdate(BaseModel):
     preferred_language: Optional[str] = Field(None, max_length=10)
     timezone: Optional[str] = Field(None, max_length=50)
     password: Optional[str] = Field(None, min_length=6)
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if v is not None and len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        return v
 
 class UserResponse(UserBase):
     id: int
@@ -47,8 +36,13 @@ class UserResponse(UserBase):
     updated_at: Optional[datetime]
     active: bool
     
-    class Config:
-        from_attributes = True
+    # DTO de solo lectura
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
+    @classmethod
+    def from_db(cls, db_user):
+        """Construir la respuesta desde una fila ya validada por la BD, sin revalidar"""
+        return cls.model_construct(**{name: getattr(db_user, name) for name in cls.model_fields})
 
 class UserInDB(UserResponse):
     password_hash: str
@@ -69,6 +63,8 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 class UserGameStats(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     total_points: int
     current_streak: int
     max_streak: int
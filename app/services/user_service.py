@@ -1,6 +1,9 @@
-from typing import Optional, List
+from dataclasses import replace
+from typing import Dict, Optional, List
 from datetime import datetime, date
+import asyncio
 import logging
+from starlette.concurrency import run_in_threadpool
 
 from app.services.base import BaseService
 from app.repositories.user_repository import UserRepository
@@ -10,26 +13,27 @@ from app.core.security import get_password_hash, verify_password
 
 logger = logging.getLogger(__name__)
 
+async def _no_user() -> None:
+    """Resultado vacío para las comprobaciones que no hace falta lanzar"""
+    return None
+
 class UserService(BaseService):
+    # Búsquedas por username en curso, compartidas entre instancias (single-flight)
+    _inflight_by_username: Dict[str, "asyncio.Task[Optional[User]]"] = {}
+    
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
     
     async def create_user(self, user_data: UserCreate, created_by: int = None) -> User:
         """Crear un nuevo usuario"""
-        # Verificar si el usuario ya existe
-        existing_user = await self.user_repository.get_by_username(user_data.username)
-        if existing_user:
-            raise ValueError("Username already exists")
-        
-        existing_email = await self.user_repository.get_by_email(user_data.email)
-        if existing_email:
-            raise ValueError("Email already exists")
+        # bcrypt es CPU-bound: se ejecuta fuera del event loop
+        password_hash = await run_in_threadpool(get_password_hash, user_data.password)
         
         # Crear el modelo de usuario
         user = User(
             username=user_data.username,
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=password_hash,
             first_name=user_data.first_name,
             last_name=user_data.last_name,
             avatar_url=user_data.avatar_url,
@@ -38,7 +42,22 @@ class UserService(BaseService):
             created_by=created_by
         )
         
-        return await self.user_repository.create(user)
+        # Un solo round-trip en el caso normal; las restricciones únicas detectan duplicados
+        created_user = await self.user_repository.create_if_unique(user)
+        if created_user is None:
+            # Las dos comprobaciones son independientes: se lanzan a la vez
+            username_owner, email_owner = await asyncio.gather(
+                self.user_repository.get_by_username(user_data.username),
+                self.user_repository.get_by_email(user_data.email)
+            )
+            if username_owner:
+                raise ValueError("Username already exists")
+            if email_owner:
+                raise ValueError("Email already exists")
+            # El conflicto puede ser con una fila borrada/inactiva u otra clave única
+            raise ValueError("Username or email already exists")
+        
+        return created_user
     
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Obtener usuario por ID"""
@@ -48,8 +67,16 @@ class UserService(BaseService):
         return None
     
     async def get_user_by_username(self, username: str) -> Optional[User]:
-        """Obtener usuario por username"""
-        user = await self.user_repository.get_by_username(username)
+        """Obtener usuario por username.
+        
+        Las peticiones concurrentes para el mismo username comparten una única consulta.
+        """
+        task = self._inflight_by_username.get(username)
+        if task is None:
+            task = asyncio.ensure_future(self.user_repository.get_by_username(username))
+            self._inflight_by_username[username] = task
+            task.add_done_callback(lambda _: self._inflight_by_username.pop(username, None))
+        user = await asyncio.shield(task)
         if user and user.deleted_at is None and user.active:
             return user
         return None
@@ -73,40 +100,47 @@ class UserService(BaseService):
         if not existing_user or existing_user.deleted_at is not None or not existing_user.active:
             return None
         
-        # Verificar duplicados si se está actualizando username o email
-        if user_update.username and user_update.username != existing_user.username:
-            username_exists = await self.user_repository.get_by_username(user_update.username)
-            if username_exists and username_exists.id != user_id:
-                raise ValueError("Username already exists")
-        
-        if user_update.email and user_update.email != existing_user.email:
-            email_exists = await self.user_repository.get_by_email(user_update.email)
-            if email_exists and email_exists.id != user_id:
-                raise ValueError("Email already exists")
+        # Verificar duplicados si se está actualizando username o email (en paralelo)
+        username_exists, email_exists = await asyncio.gather(
+            self.user_repository.get_by_username(user_update.username)
+            if user_update.username and user_update.username != existing_user.username
+            else _no_user(),
+            self.user_repository.get_by_email(user_update.email)
+            if user_update.email and user_update.email != existing_user.email
+            else _no_user()
+        )
+        if username_exists and username_exists.id != user_id:
+            raise ValueError("Username already exists")
+        if email_exists and email_exists.id != user_id:
+            raise ValueError("Email already exists")
         
         # Actualizar solo los campos proporcionados
-        update_data = user_update.dict(exclude_unset=True)
+        update_data = user_update.model_dump(exclude_unset=True)
         
         # Si se está actualizando la contraseña, hashearla
         if "password" in update_data:
-            update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+            update_data["password_hash"] = await run_in_threadpool(
+                get_password_hash, update_data.pop("password")
+            )
         
-        # Crear objeto User con los datos actualizados
-        updated_user = User(**{
-            **existing_user.to_dict(),
-            **update_data,
-            "updated_by": updated_by
-        })
+        # Copia con los datos actualizados; existing_user puede estar compartido en cachés
+        updated_user = replace(existing_user, **update_data, updated_by=updated_by)
         
         return await self.user_repository.update(user_id, updated_user)
     
-    async def update_user_game_stats(self, user_id: int, stats_update: UserUpdateGameStats, updated_by: int = None) -> Optional[User]:
-        """Actualizar estadísticas del juego de un usuario"""
-        existing_user = await self.user_repository.get_by_id(user_id)
+    async def update_user_game_stats(self, user_id: int, stats_update: UserUpdateGameStats, updated_by: int = None,
+                                     existing_user: Optional[User] = None) -> Optional[User]:
+        """Actualizar estadísticas del juego de un usuario.
+        
+        Si el llamador ya tiene el usuario cargado (p. ej. el usuario actual) puede
+        pasarlo en existing_user para evitar volver a consultarlo.
+        """
+        if existing_user is None:
+            existing_user = await self.user_repository.get_by_id(user_id)
         if not existing_user or existing_user.deleted_at is not None or not existing_user.active:
             return None
         
-        update_data = stats_update.dict(exclude_unset=True)
+        update_data = stats_update.model_dump(exclude_unset=True)
         
         return await self.user_repository.update_game_stats(
             user_id=user_id,
@@ -117,20 +151,22 @@ class UserService(BaseService):
             updated_by=updated_by
         )
     
-    async def delete_user(self, user_id: int, deleted_by: int = None) -> bool:
+    async def delete_user(self, user_id: int, deleted_by: int = None,
+                          existing_user: Optional[User] = None) -> bool:
         """Eliminar usuario (soft delete)"""
-        existing_user = await self.user_repository.get_by_id(user_id)
+        if existing_user is None:
+            existing_user = await self.user_repository.get_by_id(user_id)
         if not existing_user or existing_user.deleted_at is not None:
             return False
         
         return await self.user_repository.delete(user_id, deleted_by)
     
     async def activate_user(self, user_id: int, updated_by: int = None) -> Optional[User]:
-        """Activar usuario"""
-        existing_user = await self.user_repository.get_by_id(user_id)
-        if not existing_user:
-            return None
+        """Activar usuario.
         
+        sp_activate_user devuelve la fila actualizada (o nada si no existe),
+        así que no hace falta consultarla antes.
+        """
         return await self.user_repository.activate_user(user_id, updated_by)
     
     async def authenticate_user(self, username: str, password: str) -> Optional[User]:
@@ -142,7 +178,7 @@ class UserService(BaseService):
         if not user.active or user.deleted_at is not None:
             return None
         
-        if not verify_password(password, user.password_hash):
+        if not await run_in_threadpool(verify_password, password, user.password_hash):
             return None
         
         return user
@@ -160,14 +196,21 @@ class UserService(BaseService):
         
         return await self.user_repository.reset_daily_lives(user_id)
     
-    async def check_and_reset_daily_lives(self, user_id: int) -> Optional[User]:
-        """Verificar y resetear vidas diarias si es necesario"""
-        user = await self.get_user_by_id(user_id)
+    async def check_and_reset_daily_lives(self, user_id: int, user: Optional[User] = None) -> Optional[User]:
+        """Verificar y resetear vidas diarias si es necesario.
+        
+        Con un usuario ya cargado, el caso habitual (vidas ya reseteadas hoy) no
+        consulta la base de datos.
+        """
+        if user is None:
+            user = await self.get_user_by_id(user_id)
         if not user:
             return None
         
-        today = date.today()
-        if user.lives_reset_date != today:
+        if user.lives_reset_date != date.today():
+            # El usuario se leyó de la BD en esta petición; el get_by_id de
+            # reset_daily_lives lo toma de la caché del repositorio (por petición)
+            # sin volver a consultar, así que solo se llama a sp_reset_daily_lives
             return await self.reset_daily_lives(user_id)
         
         return user
\ No newline at end of file
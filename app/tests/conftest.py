@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_active_user
+from app.main import app
+from app.models.user import User
+
+
+@pytest.fixture
+def current_user() -> User:
+    return User(
+        id=1,
+        username="alice",
+        email="alice@example.com",
+        active=True,
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 2),
+    )
+
+
+@pytest.fixture
+def client(current_user: User):
+    """Cliente sin base de datos: el usuario actual se inyecta directamente"""
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
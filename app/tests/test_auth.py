@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from app.main import create_application
+from app.utils.exceptions import RateLimitExceededException
+
+
+def test_invalid_token_returns_www_authenticate():
+    client = TestClient(create_application())
+
+    response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer junk"})
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_exception_headers_are_forwarded():
+    app = create_application()
+
+    @app.get("/limited")
+    async def limited():
+        raise RateLimitExceededException(30)
+
+    response = TestClient(app).get("/limited")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "30"
+    assert response.json()["detail"] == (
+        "Límite de solicitudes excedido. Intenta de nuevo en 30 segundos"
+    )
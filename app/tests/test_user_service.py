@@ -0,0 +1,82 @@
+import asyncio
+
+import psycopg2.errors
+import pytest
+
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import UserCreate
+from app.services.user_service import UserService
+
+ALICE_ROW = {"id": 1, "username": "alice", "email": "alice@example.com", "active": True}
+
+
+class FakeUserRepository(UserRepository):
+    """Repositorio sin base de datos: registra los procedimientos llamados y responde con filas fijas"""
+
+    def __init__(self, results=None):
+        super().__init__(db_connection=None)
+        self.results = results or {}
+        self.calls = []
+
+    def _execute_procedure(self, procedure, params, fetch_all=False, commit=False):
+        self.calls.append(procedure)
+        result = self.results.get(procedure)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_concurrent_username_lookups_share_one_query():
+    # Un repositorio por petición, como en get_user_repository: su caché no interviene
+    repositories = [FakeUserRepository({"sp_get_user_by_username": ALICE_ROW}) for _ in range(2)]
+
+    async def lookup_twice():
+        return await asyncio.gather(*(
+            UserService(repository).get_user_by_username("alice") for repository in repositories
+        ))
+
+    first, second = asyncio.run(lookup_twice())
+
+    assert first.username == second.username == "alice"
+    assert [r.calls for r in repositories] == [["sp_get_user_by_username"], []]
+    assert "alice" not in UserService._inflight_by_username
+
+
+def test_failed_username_lookup_is_not_left_in_flight():
+    repository = FakeUserRepository({"sp_get_user_by_username": psycopg2.OperationalError("down")})
+    service = UserService(repository)
+
+    with pytest.raises(psycopg2.OperationalError):
+        asyncio.run(service.get_user_by_username("bob"))
+
+    assert "bob" not in UserService._inflight_by_username
+
+
+def test_write_clears_the_request_cache():
+    repository = FakeUserRepository({
+        "sp_get_user_by_id": ALICE_ROW,
+        "sp_reset_daily_lives": ALICE_ROW,
+    })
+
+    async def read_write_read():
+        await repository.get_by_id(1)
+        await repository.get_by_id(1)
+        await repository.reset_daily_lives(1)
+        await repository.get_by_id(1)
+
+    asyncio.run(read_write_read())
+
+    assert repository.calls == [
+        "sp_get_user_by_id",
+        "sp_reset_daily_lives",
+        "sp_get_user_by_id",
+    ]
+
+
+def test_create_conflict_without_visible_owner():
+    repository = FakeUserRepository({"sp_create_user": psycopg2.errors.UniqueViolation("duplicate")})
+    service = UserService(repository)
+    user_data = UserCreate(username="carol", email="carol@example.com", password="Secret123!")
+
+    with pytest.raises(ValueError, match="^Username or email already exists$"):
+        asyncio.run(service.create_user(user_data))
@@ -0,0 +1,61 @@
+ME_URL = "/api/v1/users/me"
+
+
+def test_me_returns_etag_and_cache_headers(client):
+    response = client.get(ME_URL)
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "alice"
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "private, max-age=30"
+
+
+def test_me_matching_etag_returns_304(client):
+    etag = client.get(ME_URL).headers["etag"]
+
+    response = client.get(ME_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_me_weak_etag_returns_304(client):
+    etag = client.get(ME_URL).headers["etag"]
+
+    response = client.get(ME_URL, headers={"If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
+
+
+def test_me_etag_in_list_without_spaces_returns_304(client):
+    etag = client.get(ME_URL).headers["etag"]
+
+    response = client.get(ME_URL, headers={"If-None-Match": f'"other",{etag}'})
+
+    assert response.status_code == 304
+
+
+def test_me_wildcard_returns_304(client):
+    response = client.get(ME_URL, headers={"If-None-Match": "*"})
+
+    assert response.status_code == 304
+
+
+def test_me_stale_etag_returns_200(client, current_user):
+    etag = client.get(ME_URL).headers["etag"]
+    current_user.updated_at = current_user.updated_at.replace(day=3)
+
+    response = client.get(ME_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_root_uses_weak_etag_comparison(client):
+    etag = client.get("/").headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": f'"other", W/{etag}'})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
@@ -1,87 +1,114 @@
 # app/utils/exceptions.py
-from typing import Optional, Any, Dict
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Any, Mapping
 from fastapi import HTTPException, status
+from psycopg2 import errorcodes
+
+# Códigos HTTP resueltos una sola vez (evita el acceso a status.* en cada raise)
+_HTTP_200 = status.HTTP_200_OK
+_HTTP_400 = status.HTTP_400_BAD_REQUEST
+_HTTP_401 = status.HTTP_401_UNAUTHORIZED
+_HTTP_402 = status.HTTP_402_PAYMENT_REQUIRED
+_HTTP_403 = status.HTTP_403_FORBIDDEN
+_HTTP_404 = status.HTTP_404_NOT_FOUND
+_HTTP_409 = status.HTTP_409_CONFLICT
+_HTTP_429 = status.HTTP_429_TOO_MANY_REQUESTS
+_HTTP_500 = status.HTTP_500_INTERNAL_SERVER_ERROR
+_HTTP_503 = status.HTTP_503_SERVICE_UNAVAILABLE
 
 
 class LearningAppException(HTTPException):
     """Excepción base para la aplicación."""
     
+    # Las subclases declaran su código en la clase:
+    # class X(LearningAppException, error_code="X_400")
+    error_code: Optional[str] = None
+    
+    def __init_subclass__(cls, error_code: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if error_code is not None:
+            cls.error_code = error_code
+    
     def __init__(
         self,
         status_code: int,
         detail: str,
         error_type: str = "application_error",
         error_code: Optional[str] = None,
-        headers: Optional[Dict[str, Any]] = None
+        headers: Optional[Mapping[str, Any]] = None
     ):
         super().__init__(status_code=status_code, detail=detail, headers=headers)
         self.error_type = error_type
-        self.error_code = error_code or f"ERR_{status_code}"
+        if error_code is not None:
+            self.error_code = error_code
+        elif self.error_code is None:
+            self.error_code = f"ERR_{status_code}"
 
 
 # =============================================================================
 # USER EXCEPTIONS
 # =============================================================================
 
-class UserNotFoundException(LearningAppException):
+class UserNotFoundException(LearningAppException, error_code="USER_404"):
     """Excepción cuando no se encuentra un usuario."""
     
+    _TEMPLATE = "Usuario %s no encontrado"
+    
     def __init__(self, user_identifier: str = ""):
         super().__init__(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario {user_identifier} no encontrado".strip(),
-            error_type="user_not_found",
-            error_code="USER_404"
+            status_code=_HTTP_404,
+            detail=(self._TEMPLATE % (user_identifier,)).strip(),
+            error_type="user_not_found"
         )
 
 
-class UserAlreadyExistsException(LearningAppException):
+class UserAlreadyExistsException(LearningAppException, error_code="USER_409"):
     """Excepción cuando un usuario ya existe."""
     
+    _TEMPLATE = "Ya existe un usuario con %s: %s"
+    
     def __init__(self, field: str = "email", value: str = ""):
         super().__init__(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Ya existe un usuario con {field}: {value}",
-            error_type="user_already_exists",
-            error_code="USER_409"
+            status_code=_HTTP_409,
+            detail=self._TEMPLATE % (field, value),
+            error_type="user_already_exists"
         )
 
 
-class UserInactiveException(LearningAppException):
+class UserInactiveException(LearningAppException, error_code="USER_403"):
     """Excepción cuando un usuario está inactivo."""
     
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=_HTTP_403,
             detail="La cuenta de usuario está inactiva",
-            error_type="user_inactive",
-            error_code="USER_403"
+            error_type="user_inactive"
         )
 
 
-class InvalidCredentialsException(LearningAppException):
+class InvalidCredentialsException(LearningAppException, error_code="AUTH_401"):
     """Excepción para credenciales inválidas."""
     
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=_HTTP_401,
             detail="Email o contraseña incorrectos",
             error_type="invalid_credentials",
-            error_code="AUTH_401",
             headers={"WWW-Authenticate": "Bearer"}
         )
 
 
-class WeakPasswordException(LearningAppException):
+class WeakPasswordException(LearningAppException, error_code="PASS_400"):
     """Excepción para contraseñas débiles."""
     
     def __init__(self, errors: list):
         error_msg = "La contraseña no cumple con los requisitos: " + "; ".join(errors)
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=_HTTP_400,
             detail=error_msg,
-            error_type="weak_password",
-            error_code="PASS_400"
+            error_type="weak_password"
         )
 
 
@@ -89,41 +116,40 @@ class WeakPasswordException(LearningAppException):
 # AUTHENTICATION EXCEPTIONS
 # =============================================================================
 
-class TokenExpiredException(LearningAppException):
+class TokenExpiredException(LearningAppException, error_code="TOKEN_401"):
     """Excepción cuando un token ha expirado."""
     
+    _TEMPLATE = "El token de %s ha expirado"
+    
     def __init__(self, token_type: str = "access"):
         super().__init__(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"El token de {token_type} ha expirado",
+            status_code=_HTTP_401,
+            detail=self._TEMPLATE % (token_type,),
             error_type="token_expired",
-            error_code="TOKEN_401",
             headers={"WWW-Authenticate": "Bearer"}
         )
 
 
-class InvalidTokenException(LearningAppException):
+class InvalidTokenException(LearningAppException, error_code="TOKEN_401"):
     """Excepción para tokens inválidos."""
     
     def __init__(self, reason: str = "Token inválido"):
         super().__init__(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=_HTTP_401,
             detail=reason,
             error_type="invalid_token",
-            error_code="TOKEN_401",
             headers={"WWW-Authenticate": "Bearer"}
         )
 
 
-class MissingTokenException(LearningAppException):
+class MissingTokenException(LearningAppException, error_code="TOKEN_401"):
     """Excepción cuando no se proporciona token."""
     
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=_HTTP_401,
             detail="Se requiere token de autenticación",
             error_type="missing_token",
-            error_code="TOKEN_401",
             headers={"WWW-Authenticate": "Bearer"}
         )
 
@@ -132,41 +158,38 @@ class MissingTokenException(LearningAppException):
 # COURSE EXCEPTIONS
 # =============================================================================
 
-class CourseNotFoundException(LearningAppException):
+class CourseNotFoundException(LearningAppException, error_code="COURSE_404"):
     """Excepción cuando no se encuentra un curso."""
     
     def __init__(self, course_id: int = None):
         detail = f"Curso con ID {course_id} no encontrado" if course_id else "Curso no encontrado"
         super().__init__(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=_HTTP_404,
             detail=detail,
-            error_type="course_not_found",
-            error_code="COURSE_404"
+            error_type="course_not_found"
         )
 
 
-class CourseAlreadyEnrolledException(LearningAppException):
+class CourseAlreadyEnrolledException(LearningAppException, error_code="COURSE_409"):
     """Excepción cuando un usuario ya está inscrito en un curso."""
     
     def __init__(self, course_title: str = ""):
         detail = f"Ya estás inscrito en el curso: {course_title}" if course_title else "Ya estás inscrito en este curso"
         super().__init__(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=_HTTP_409,
             detail=detail,
-            error_type="course_already_enrolled",
-            error_code="COURSE_409"
+            error_type="course_already_enrolled"
         )
 
 
-class PremiumCourseRequiredException(LearningAppException):
+class PremiumCourseRequiredException(LearningAppException, error_code="COURSE_402"):
     """Excepción para cursos premium sin acceso."""
     
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            status_code=_HTTP_402,
             detail="Este curso requiere una suscripción premium",
-            error_type="premium_required",
-            error_code="COURSE_402"
+            error_type="premium_required"
         )
 
 
@@ -174,33 +197,31 @@ class PremiumCourseRequiredException(LearningAppException):
 # EXERCISE EXCEPTIONS
 # =============================================================================
 
-class ExerciseNotFoundException(LearningAppException):
+class ExerciseNotFoundException(LearningAppException, error_code="EXERCISE_404"):
     """Excepción cuando no se encuentra un ejercicio."""
     
     def __init__(self, exercise_id: int = None):
         detail = f"Ejercicio con ID {exercise_id} no encontrado" if exercise_id else "Ejercicio no encontrado"
         super().__init__(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=_HTTP_404,
             detail=detail,
-            error_type="exercise_not_found",
-            error_code="EXERCISE_404"
+            error_type="exercise_not_found"
         )
 
 
-class TopicNotUnlockedException(LearningAppException):
+class TopicNotUnlockedException(LearningAppException, error_code="TOPIC_403"):
     """Excepción cuando un tema no está desbloqueado."""
     
     def __init__(self, topic_title: str = ""):
         detail = f"El tema '{topic_title}' no está desbloqueado" if topic_title else "Este tema no está desbloqueado"
         super().__init__(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=_HTTP_403,
             detail=detail,
-            error_type="topic_locked",
-            error_code="TOPIC_403"
+            error_type="topic_locked"
         )
 
 
-class NoLivesRemainingException(LearningAppException):
+class NoLivesRemainingException(LearningAppException, error_code="LIVES_429"):
     """Excepción cuando no quedan vidas."""
     
     def __init__(self, reset_time: str = ""):
@@ -208,14 +229,13 @@ class NoLivesRemainingException(LearningAppException):
         if reset_time:
             detail += f". Se restablecerán a las {reset_time}"
         super().__init__(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            status_code=_HTTP_429,
             detail=detail,
-            error_type="no_lives_remaining",
-            error_code="LIVES_429"
+            error_type="no_lives_remaining"
         )
 
 
-class InvalidAnswerFormatException(LearningAppException):
+class InvalidAnswerFormatException(LearningAppException, error_code="ANSWER_400"):
     """Excepción para formato de respuesta inválido."""
     
     def __init__(self, expected_format: str = ""):
@@ -223,10 +243,9 @@ class InvalidAnswerFormatException(LearningAppException):
         if expected_format:
             detail += f". Se esperaba: {expected_format}"
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=_HTTP_400,
             detail=detail,
-            error_type="invalid_answer_format",
-            error_code="ANSWER_400"
+            error_type="invalid_answer_format"
         )
 
 
@@ -234,38 +253,56 @@ class InvalidAnswerFormatException(LearningAppException):
 # VALIDATION EXCEPTIONS
 # =============================================================================
 
-class ValidationException(LearningAppException):
+class ValidationException(LearningAppException, error_code="VALIDATION_400"):
     """Excepción para errores de validación."""
     
+    _TEMPLATE = "Error de validación en %s: %s"
+    
     def __init__(self, field: str, message: str):
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Error de validación en {field}: {message}",
-            error_type="validation_error",
-            error_code="VALIDATION_400"
+            status_code=_HTTP_400,
+            detail=_validation_detail(field, message),
+            error_type="validation_error"
         )
 
 
+@lru_cache(maxsize=64)
+def _validation_detail(field: str, message: str) -> str:
+    """Detalle de validación compartido: los mensajes habituales son pocos y fijos."""
+    return ValidationException._TEMPLATE % (field, message)
+
+
 class InvalidEmailFormatException(ValidationException):
     """Excepción para formato de email inválido."""
     
+    _DETAIL = ValidationException._TEMPLATE % ("email", "El formato del email no es válido")
+    
     def __init__(self):
-        super().__init__("email", "El formato del email no es válido")
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_400,
+            detail=self._DETAIL,
+            error_type="validation_error"
+        )
 
 
 class InvalidUsernameFormatException(ValidationException):
     """Excepción para formato de username inválido."""
     
     def __init__(self, errors: list):
-        error_msg = "; ".join(errors)
-        super().__init__("username", error_msg)
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_400,
+            detail=self._TEMPLATE % ("username", "; ".join(errors)),
+            error_type="validation_error"
+        )
 
 
 # =============================================================================
 # PERMISSION EXCEPTIONS
 # =============================================================================
 
-class InsufficientPermissionsException(LearningAppException):
+class InsufficientPermissionsException(LearningAppException, error_code="PERM_403"):
     """Excepción para permisos insuficientes."""
     
     def __init__(self, required_permission: str = ""):
@@ -273,22 +310,20 @@ class InsufficientPermissionsException(LearningAppException):
         if required_permission:
             detail += f". Se requiere: {required_permission}"
         super().__init__(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=_HTTP_403,
             detail=detail,
-            error_type="insufficient_permissions",
-            error_code="PERM_403"
+            error_type="insufficient_permissions"
         )
 
 
-class AdminRequiredException(LearningAppException):
+class AdminRequiredException(LearningAppException, error_code="ADMIN_403"):
     """Excepción cuando se requieren permisos de administrador."""
     
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=_HTTP_403,
             detail="Se requieren permisos de administrador para esta acción",
-            error_type="admin_required",
-            error_code="ADMIN_403"
+            error_type="admin_required"
         )
 
 
@@ -296,85 +331,103 @@ class AdminRequiredException(LearningAppException):
 # DATABASE EXCEPTIONS
 # =============================================================================
 
-class DatabaseException(LearningAppException):
+class DatabaseException(LearningAppException, error_code="DB_500"):
     """Excepción para errores de base de datos."""
     
     def __init__(self, detail: str = "Error de base de datos"):
         super().__init__(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=_HTTP_500,
             detail=detail,
-            error_type="database_error",
-            error_code="DB_500"
+            error_type="database_error"
         )
 
 
-class StoredProcedureException(DatabaseException):
+class StoredProcedureException(DatabaseException, error_code="SP_500"):
     """Excepción para errores en stored procedures."""
     
+    _TEMPLATE = "Error ejecutando %s: %s"
+    
     def __init__(self, procedure_name: str, error: str):
-        super().__init__(
-            detail=f"Error ejecutando {procedure_name}: {error}"
+        # Se llama a la base directamente, sin pasar por DatabaseException.__init__
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_500,
+            detail=self._TEMPLATE % (procedure_name, error),
+            error_type="database_error"
         )
-        self.error_code = "SP_500"
 
 
-class DatabaseConnectionException(DatabaseException):
+class DatabaseConnectionException(DatabaseException, error_code="DB_CONN_500"):
     """Excepción para errores de conexión a base de datos."""
     
     def __init__(self):
-        super().__init__(
-            detail="No se pudo conectar a la base de datos"
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_500,
+            detail="No se pudo conectar a la base de datos",
+            error_type="database_error"
         )
-        self.error_code = "DB_CONN_500"
 
 
 # =============================================================================
 # FILE EXCEPTIONS
 # =============================================================================
 
-class FileUploadException(LearningAppException):
+class FileUploadException(LearningAppException, error_code="FILE_400"):
     """Excepción para errores de subida de archivos."""
     
     def __init__(self, detail: str = "Error subiendo archivo"):
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=_HTTP_400,
             detail=detail,
-            error_type="file_upload_error",
-            error_code="FILE_400"
+            error_type="file_upload_error"
         )
 
 
-class FileSizeExceededException(FileUploadException):
+class FileSizeExceededException(FileUploadException, error_code="FILE_SIZE_400"):
     """Excepción cuando el archivo excede el tamaño máximo."""
     
+    _TEMPLATE = "El archivo excede el tamaño máximo permitido de %sMB"
+    
     def __init__(self, max_size_mb: float):
-        super().__init__(
-            detail=f"El archivo excede el tamaño máximo permitido de {max_size_mb}MB"
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_400,
+            detail=self._TEMPLATE % (max_size_mb,),
+            error_type="file_upload_error"
         )
-        self.error_code = "FILE_SIZE_400"
 
 
-class InvalidFileTypeException(FileUploadException):
+class InvalidFileTypeException(FileUploadException, error_code="FILE_TYPE_400"):
     """Excepción para tipos de archivo no permitidos."""
     
+    _TEMPLATE = "Tipo de archivo no permitido. Tipos permitidos: %s"
+    
     def __init__(self, allowed_types: list):
-        allowed_str = ", ".join(allowed_types)
-        super().__init__(
-            detail=f"Tipo de archivo no permitido. Tipos permitidos: {allowed_str}"
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_400,
+            detail=self._TEMPLATE % (_join_allowed_types(tuple(allowed_types)),),
+            error_type="file_upload_error"
         )
-        self.error_code = "FILE_TYPE_400"
 
 
-class FileNotFoundException(LearningAppException):
+@lru_cache(maxsize=32)
+def _join_allowed_types(allowed_types: tuple) -> str:
+    """Lista de tipos permitidos ya unida; los llamadores repiten siempre las mismas."""
+    return ", ".join(allowed_types)
+
+
+class FileNotFoundException(LearningAppException, error_code="FILE_404"):
     """Excepción cuando no se encuentra un archivo."""
     
+    _TEMPLATE = "Archivo %s no encontrado"
+    
     def __init__(self, filename: str = ""):
-        detail = f"Archivo {filename} no encontrado" if filename else "Archivo no encontrado"
         super().__init__(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=detail,
-            error_type="file_not_found",
-            error_code="FILE_404"
+            status_code=_HTTP_404,
+            detail=self._TEMPLATE % (filename,) if filename else "Archivo no encontrado",
+            error_type="file_not_found"
         )
 
 
@@ -382,59 +435,80 @@ class FileNotFoundException(LearningAppException):
 # RATE LIMITING EXCEPTIONS
 # =============================================================================
 
-class RateLimitExceededException(LearningAppException):
+class RateLimitExceededException(LearningAppException, error_code="RATE_429"):
     """Excepción para límite de tasa excedido."""
     
+    _TEMPLATE = "Límite de solicitudes excedido. Intenta de nuevo en %s segundos"
+    
     def __init__(self, retry_after: int = 60):
+        detail, headers = _rate_limit_parts(retry_after)
         super().__init__(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Límite de solicitudes excedido. Intenta de nuevo en {retry_after} segundos",
+            status_code=_HTTP_429,
+            detail=detail,
             error_type="rate_limit_exceeded",
-            error_code="RATE_429",
-            headers={"Retry-After": str(retry_after)}
+            headers=headers
         )
 
 
+@lru_cache(maxsize=16)
+def _rate_limit_parts(retry_after: int):
+    """Detalle y cabeceras de un 429, compartidos entre los raise con el mismo retry_after.
+    
+    Las cabeceras son de solo lectura porque la misma instancia se reutiliza.
+    """
+    return (
+        RateLimitExceededException._TEMPLATE % (retry_after,),
+        MappingProxyType({"Retry-After": str(retry_after)})
+    )
+
+
 # =============================================================================
 # BUSINESS LOGIC EXCEPTIONS
 # =============================================================================
 
-class StreakBrokenException(LearningAppException):
+class StreakBrokenException(LearningAppException, error_code="STREAK_200"):
     """Excepción cuando se rompe una racha."""
     
+    _TEMPLATE = "Se rompió tu racha de %s días"
+    
     def __init__(self, previous_streak: int):
         super().__init__(
-            status_code=status.HTTP_200_OK,  # No es realmente un error
-            detail=f"Se rompió tu racha de {previous_streak} días",
-            error_type="streak_broken",
-            error_code="STREAK_200"
+            status_code=_HTTP_200,  # No es realmente un error
+            detail=self._TEMPLATE % (previous_streak,),
+            error_type="streak_broken"
         )
 
 
-class InsufficientPointsException(LearningAppException):
+class InsufficientPointsException(LearningAppException, error_code="POINTS_400"):
     """Excepción cuando no hay suficientes puntos."""
     
+    _TEMPLATE = "Puntos insuficientes. Requeridos: %s, Actuales: %s"
+    
     def __init__(self, required_points: int, current_points: int):
         super().__init__(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Puntos insuficientes. Requeridos: {required_points}, Actuales: {current_points}",
-            error_type="insufficient_points",
-            error_code="POINTS_400"
+            status_code=_HTTP_400,
+            detail=self._TEMPLATE % (required_points, current_points),
+            error_type="insufficient_points"
         )
 
 
-class LevelNotUnlockedException(LearningAppException):
+class LevelNotUnlockedException(LearningAppException, error_code="LEVEL_403"):
     """Excepción cuando un nivel no está desbloqueado."""
     
+    # Indexado por (hay título, hay puntos requeridos)
+    _TEMPLATES = (
+        "Este nivel no está desbloqueado",
+        "Este nivel no está desbloqueado. Se requieren %(points)s puntos",
+        "El nivel '%(title)s' no está desbloqueado",
+        "El nivel '%(title)s' no está desbloqueado. Se requieren %(points)s puntos",
+    )
+    
     def __init__(self, level_title: str = "", required_points: int = 0):
-        detail = f"El nivel '{level_title}' no está desbloqueado" if level_title else "Este nivel no está desbloqueado"
-        if required_points > 0:
-            detail += f". Se requieren {required_points} puntos"
+        template = self._TEMPLATES[(bool(level_title) << 1) | (required_points > 0)]
         super().__init__(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=detail,
-            error_type="level_locked",
-            error_code="LEVEL_403"
+            status_code=_HTTP_403,
+            detail=template % {"title": level_title, "points": required_points},
+            error_type="level_locked"
         )
 
 
@@ -442,15 +516,16 @@ class LevelNotUnlockedException(LearningAppException):
 # EXTERNAL SERVICE EXCEPTIONS
 # =============================================================================
 
-class ExternalServiceException(LearningAppException):
+class ExternalServiceException(LearningAppException, error_code="EXT_503"):
     """Excepción para errores de servicios externos."""
     
+    _TEMPLATE = "Error en %s: %s"
+    
     def __init__(self, service_name: str, detail: str = "Servicio no disponible"):
         super().__init__(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Error en {service_name}: {detail}",
-            error_type="external_service_error",
-            error_code="EXT_503"
+            status_code=_HTTP_503,
+            detail=self._TEMPLATE % (service_name, detail),
+            error_type="external_service_error"
         )
 
 
@@ -458,25 +533,48 @@ class EmailServiceException(ExternalServiceException):
     """Excepción para errores del servicio de email."""
     
     def __init__(self, detail: str = "No se pudo enviar el email"):
-        super().__init__("servicio de email", detail)
+        LearningAppException.__init__(
+            self,
+            status_code=_HTTP_503,
+            detail=self._TEMPLATE % ("servicio de email", detail),
+            error_type="external_service_error"
+        )
 
 
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
+# SQLSTATE de PostgreSQL con excepción propia
+_PGCODE_EXCEPTIONS = {
+    errorcodes.UNIQUE_VIOLATION: UserAlreadyExistsException,
+    errorcodes.NO_DATA_FOUND: UserNotFoundException,
+}
+
+# Clasificación por mensaje para errores sin SQLSTATE conocido (una sola pasada)
+_DB_ERROR_RE = re.compile(r"duplicate key|not found", re.IGNORECASE)
+_MESSAGE_EXCEPTIONS = {
+    "duplicate key": UserAlreadyExistsException,
+    "not found": UserNotFoundException,
+}
+
+
 def handle_database_error(func):
     """Decorator para manejar errores de base de datos."""
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
         except Exception as e:
-            if "duplicate key" in str(e).lower():
-                raise UserAlreadyExistsException()
-            elif "not found" in str(e).lower():
-                raise UserNotFoundException()
-            else:
-                raise DatabaseException(f"Error de base de datos: {str(e)}")
+            # Los errores de psycopg2 traen el SQLSTATE en pgcode; el resto se
+            # clasifica por el mensaje. "from None" descarta el contexto original
+            exc_class = _PGCODE_EXCEPTIONS.get(getattr(e, "pgcode", None))
+            if exc_class is not None:
+                raise exc_class() from None
+            message = str(e)
+            match = _DB_ERROR_RE.search(message)
+            if match:
+                raise _MESSAGE_EXCEPTIONS[match.group().lower()]() from None
+            raise DatabaseException(f"Error de base de datos: {message}") from None
     return wrapper
 
 
@@ -490,18 +588,23 @@ def validate_positive_id(entity_id: int, entity_name: str = "Entity") -> int:
     return entity_id
 
 
+_MSG_PAGE = "El número de página debe ser mayor a 0"
+_MSG_PAGE_SIZE = "El tamaño de página debe ser mayor a 0"
+
+
 def validate_pagination_params(page: int, page_size: int, max_page_size: int = 100):
     """Valida parámetros de paginación."""
+    # Caso habitual: una sola comprobación combinada
+    if page >= 1 and 1 <= page_size <= max_page_size:
+        return page, page_size
+    
     if page < 1:
-        raise ValidationException("page", "El número de página debe ser mayor a 0")
+        raise ValidationException("page", _MSG_PAGE)
     
     if page_size < 1:
-        raise ValidationException("page_size", "El tamaño de página debe ser mayor a 0")
-    
-    if page_size > max_page_size:
-        raise ValidationException(
-            "page_size", 
-            f"El tamaño de página no puede ser mayor a {max_page_size}"
-        )
+        raise ValidationException("page_size", _MSG_PAGE_SIZE)
     
-    return page, page_size
\ No newline at end of file
+    raise ValidationException(
+        "page_size", 
+        f"El tamaño de página no puede ser mayor a {max_page_size}"
+    )
\ No newline at end of file
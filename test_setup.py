@@ -12,6 +12,9 @@ from pathlib import Path
 # Agregar el directorio raíz al path
 sys.path.insert(0, str(Path(__file__).parent))
 
+EXPECTED_ROUTES = frozenset({"/", "/health", "/info"})
+DATABASE_CHECK_TIMEOUT = 3.0
+
 async def test_configuration():
     """Prueba la configuración de la aplicación."""
     print("🔧 Probando configuración...")
@@ -29,14 +32,27 @@ async def test_configuration():
         return False
 
 
+def _ping_database() -> bool:
+    """Ejecuta SELECT 1 con una conexión del pool de la aplicación (bloqueante)."""
+    from app.core.database import db_connection
+    
+    with db_connection.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone()[0] == 1
+
+
 async def test_database_connection():
     """Prueba la conexión a la base de datos."""
     print("\n🗄️  Probando conexión a base de datos...")
     
     try:
-        from app.core.database import check_database_connection
-        
-        is_connected = await check_database_connection()
+        # psycopg2 es bloqueante: el ping corre en un hilo y wait_for acota la
+        # espera; PGCONNECT_TIMEOUT hace que libpq abandone también el connect
+        os.environ.setdefault("PGCONNECT_TIMEOUT", str(int(DATABASE_CHECK_TIMEOUT)))
+        is_connected = await asyncio.wait_for(
+            asyncio.to_thread(_ping_database), timeout=DATABASE_CHECK_TIMEOUT
+        )
         if is_connected:
             print("✅ Conexión a base de datos exitosa")
             return True
@@ -44,6 +60,9 @@ async def test_database_connection():
             print("❌ No se pudo conectar a la base de datos")
             print("   Verifica que PostgreSQL esté ejecutándose y las credenciales sean correctas")
             return False
+    except asyncio.TimeoutError:
+        print(f"❌ La base de datos no respondió en {DATABASE_CHECK_TIMEOUT} segundos")
+        return False
     except Exception as e:
         print(f"❌ Error probando base de datos: {e}")
         return False
@@ -173,14 +192,14 @@ async def test_fastapi_app():
         print(f"   - Título: {app.title}")
         print(f"   - Versión: {app.version}")
         
-        # Verificar rutas básicas
-        routes = [route.path for route in app.routes]
-        expected_routes = ["/", "/health", "/info"]
+        # Verificar rutas básicas (se informan todas las que falten)
+        routes = {route.path for route in app.routes}
+        missing_routes = EXPECTED_ROUTES - routes
         
-        for route in expected_routes:
-            if route not in routes:
+        if missing_routes:
+            for route in sorted(missing_routes):
                 print(f"❌ Ruta faltante: {route}")
-                return False
+            return False
         
         print("✅ Rutas básicas configuradas correctamente")
         return True